@@ -1,18 +1,13 @@
 # CineScope_Recommender/agent.py
 
 from pathlib import Path
+from typing import Any
 
 from dotenv import load_dotenv
 
 # Load environment variables from .env file in the same directory
 load_dotenv(Path(__file__).parent / ".env")
 
-from google.adk.agents import LlmAgent
-from google.adk.tools.mcp_tool.mcp_toolset import McpToolset, StdioServerParameters
-
-
-PATH_TO_MCP_SERVER = str((Path(__file__).parent / "mcp_server.py").resolve())
-
 SYSTEM_PROMPT = """
 You are an assistant that only answers using data fetched via MCP tools.
 If a tool lacks data, say so and offer alternatives.
@@ -31,24 +26,50 @@ Use:
 - search_title for "who starred in X", "find X"
 - get_recommendations for "if I liked X, what next?"
 - discover for filter-based queries (year, genre, language, sort_by).
+- batch_execute when a request needs several independent calls at once
+  (e.g. search_title plus discover), instead of one call per turn.
 """
 
 # Combine system + developer behaviour into a single instruction,
 # since this ADK version doesn't support `developer_description`.
 COMBINED_INSTRUCTION = (SYSTEM_PROMPT.strip() + "\n\n" + DEVELOPER_PROMPT.strip()).strip()
 
-root_agent = LlmAgent(
-    model="gemini-2.5-flash",
-    # IMPORTANT: must be a valid identifier (no spaces)
-    name="CineScope_Recommender",
-    description="A helpful assistant for recommending movies and TV shows.",
-    instruction=COMBINED_INSTRUCTION,
-    tools=[
-        McpToolset(
-            connection_params=StdioServerParameters(
-                command="python3",
-                args=[PATH_TO_MCP_SERVER],
-            )
+_root_agent = None
+
+
+def get_root_agent():
+    """Build the ADK agent on first use and reuse it afterwards.
+
+    Importing this module (e.g. for the prompt tests) doesn't pull in ADK,
+    touch the filesystem or set up the MCP toolset.
+    """
+    global _root_agent
+    if _root_agent is None:
+        from google.adk.agents import LlmAgent
+        from google.adk.tools.mcp_tool.mcp_toolset import McpToolset, StdioServerParameters
+
+        path_to_mcp_server = str((Path(__file__).parent / "mcp_server.py").resolve())
+
+        _root_agent = LlmAgent(
+            model="gemini-2.5-flash",
+            # IMPORTANT: must be a valid identifier (no spaces)
+            name="CineScope_Recommender",
+            description="A helpful assistant for recommending movies and TV shows.",
+            instruction=COMBINED_INSTRUCTION,
+            tools=[
+                McpToolset(
+                    connection_params=StdioServerParameters(
+                        command="python3",
+                        args=[path_to_mcp_server],
+                    )
+                )
+            ],
         )
-    ],
-)
+    return _root_agent
+
+
+def __getattr__(name: str) -> Any:
+    # `adk run` looks up `root_agent` on this module; build it on that access.
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
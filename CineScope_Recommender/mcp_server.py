@@ -1,12 +1,16 @@
 # CineScope_Recommender/mcp_server.py
 
 import asyncio
-import json
+import importlib.util
+import itertools
 import logging
+import math
 import os
+import random
+import sys
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Literal, Optional, Tuple, Type, TypeVar
 
 from dotenv import load_dotenv
 from pathlib import Path
@@ -15,6 +19,9 @@ from datetime import datetime, timezone
 load_dotenv(Path(__file__).parent / ".env")
 
 import httpx
+import msgspec
+import orjson
+from cachetools import TTLCache
 from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
@@ -32,43 +39,90 @@ logging.basicConfig(
 )
 
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
-if not TMDB_API_KEY:
+_HAVE_KEY = bool(TMDB_API_KEY)
+if not _HAVE_KEY:
     logger.warning("TMDB_API_KEY not set – server will return an error for all calls.")
 
+_STARTUP_ISO = datetime.now(timezone.utc).isoformat()
+
 
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
 CACHE_TTL_SECONDS = 300  # 5 minutes
-MAX_RETRIES = 3
-INITIAL_BACKOFF_SECONDS = 1.0
+NEGATIVE_CACHE_TTL_SECONDS = 60  # remember "not found" searches for 1 minute
+GENRE_CACHE_TTL_SECONDS = 24 * 60 * 60  # TMDB's genre lists rarely change
+MAX_RETRIES = 5
+INITIAL_BACKOFF_SECONDS = 0.25  # TMDB rate limits usually reset within ~250ms
+MAX_BACKOFF_SECONDS = 8.0
+BACKOFF_JITTER_SECONDS = 0.25
+MAX_PAGES = 5  # upper bound for multi-page search/discover fan-out
+MAX_BATCH_CALLS = 10
+DEFAULT_BATCH_CONCURRENCY = 4
 
 server = Server("tmdb-film-tv-explorer")
 
-# Simple in-memory cache: {(tool_name, args_json): (ts, data)}
-_cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+# Canonical item-type strings. Incoming args carry freshly decoded copies,
+# so map them onto these before they end up in (cached) result dicts.
+_T_MOVIE = sys.intern("movie")
+_T_TV = sys.intern("tv")
+_ITEM_TYPES = {_T_MOVIE: _T_MOVIE, _T_TV: _T_TV}
 
+# Bounded in-memory TTL cache: {(tool_name, frozen_args): (data, encoded_text)}
+# The encoded JSON is kept alongside the payload so cache hits skip serialisation.
+_cache: TTLCache = TTLCache(maxsize=1024, ttl=CACHE_TTL_SECONDS)
 
-def _cache_get(tool_name: str, args: Dict[str, Any]) -> Optional[Any]:
-    key = (tool_name, json.dumps(args, sort_keys=True))
-    entry = _cache.get(key)
-    if not entry:
-        return None
-    ts, data = entry
-    if time.time() - ts > CACHE_TTL_SECONDS:
-        _cache.pop(key, None)
-        return None
-    return data
 
+# Marks frozen dicts so {"a": 1} and [["a", 1]] can't produce the same key.
+_DICT_TAG = object()
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn JSON containers into hashable tuples (dicts by sorted items)."""
+    if isinstance(value, dict):
+        return (_DICT_TAG, tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _cache_key(tool_name: str, args: Dict[str, Any]) -> Tuple[str, Any]:
+    """Hashable cache key; nested lists/dicts (e.g. `genre`) are frozen to tuples."""
+    return (tool_name, _freeze(args))
+
+
+# Short-lived cache of searches that found nothing: {cache_key: error_message}
+_negative_cache: TTLCache = TTLCache(maxsize=256, ttl=NEGATIVE_CACHE_TTL_SECONDS)
+
+
+class _OwnerCancelled(Exception):
+    """Set on an in-flight future when the call that owns it is cancelled."""
+
+
+# Single-flight map so concurrent identical calls share one TMDB request.
+_inflight: Dict[Tuple[str, Any], "asyncio.Future[Tuple[Any, str]]"] = {}
 
-CACHE_TTL_SECONDS = 300  # 5 minutes
 
-MAX_RETRIES = 3
-INITIAL_BACKOFF_SECONDS = 1.0
+# Cache helpers take a prebuilt `_cache_key` so each call freezes its args once.
+def _cache_get(key: Tuple[str, Any]) -> Optional[Tuple[Any, str]]:
+    try:
+        return _cache[key]
+    except KeyError:
+        return None
 
 
+def _raise_if_not_found(key: Tuple[str, Any]) -> None:
+    """Re-raise a recent TITLE_NOT_FOUND for the same search without hitting TMDB."""
+    try:
+        message = _negative_cache[key]
+    except KeyError:
+        return
+    raise TMDBError(message, code="TITLE_NOT_FOUND", status=404)
+
 
-def _cache_set(tool_name: str, args: Dict[str, Any], data: Any) -> None:
-    key = (tool_name, json.dumps(args, sort_keys=True))
-    _cache[key] = (time.time(), data)
+def _cache_set(key: Tuple[str, Any], data: Any) -> str:
+    """Cache `data` with its JSON encoding and return the encoded text."""
+    text = orjson.dumps(data).decode()
+    _cache[key] = (data, text)
+    return text
 
 
 # -----------------------------------------------------------------------------
@@ -82,26 +136,62 @@ class TMDBError(Exception):
         self.status = status
 
 
+# Shared client so TCP/TLS connections are pooled and kept alive across calls.
+# HTTP/2 is only enabled when the optional `h2` package is installed.
+# No custom transport is passed, so httpx keeps honouring HTTP(S)_PROXY /
+# ALL_PROXY from the environment; _tmdb_get does all retrying itself.
+_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            base_url=TMDB_BASE_URL,
+            timeout=_TIMEOUT,
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        )
+    return _http_client
+
+
+def _next_backoff(backoff: float) -> float:
+    # Exponential, capped, with jitter so concurrent (batch) callers don't retry in lockstep.
+    return min(backoff * 2, MAX_BACKOFF_SECONDS) + random.uniform(0, BACKOFF_JITTER_SECONDS)
+
+
+def _retry_after(resp: httpx.Response, default: float) -> float:
+    """Delay requested by TMDB's Retry-After header (in seconds), else `default`.
+
+    Clamped to [0, MAX_BACKOFF_SECONDS] so a large header can't stall the tool call.
+    """
+    try:
+        delay = float(resp.headers.get("Retry-After", default))
+    except ValueError:
+        return default
+    if not math.isfinite(delay):
+        return default
+    return min(max(delay, 0.0), MAX_BACKOFF_SECONDS)
+
+
 async def _tmdb_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
     if not TMDB_API_KEY:
         raise TMDBError("TMDB_API_KEY missing in environment", code="CONFIG_ERROR", status=500)
 
-    url = f"{TMDB_BASE_URL}{path}"
     params = {**params, "api_key": TMDB_API_KEY}
-    timeout = httpx.Timeout(10.0, connect=5.0)
+    client = await _get_client()
 
     backoff = INITIAL_BACKOFF_SECONDS
 
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.get(url, params=params)
+            resp = await client.get(path, params=params)
         except httpx.RequestError as e:
-            # Network/socket/DNS errors
+            # Connect failures, stale keep-alive connections, read timeouts, ... – safe to retry a GET
             logger.warning(
-                "Network error calling TMDB (%s %s), attempt %s/%s: %s",
+                "Network error calling TMDB (%s), attempt %s/%s: %s",
                 path,
-                params,
                 attempt,
                 MAX_RETRIES,
                 e,
@@ -113,7 +203,7 @@ async def _tmdb_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
                     status=500,
                 )
             await asyncio.sleep(backoff)
-            backoff *= 2
+            backoff = _next_backoff(backoff)
             continue
 
         # Rate limit (429) – transient
@@ -130,8 +220,8 @@ async def _tmdb_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
                     code="RATE_LIMIT",
                     status=429,
                 )
-            await asyncio.sleep(backoff)
-            backoff *= 2
+            await asyncio.sleep(_retry_after(resp, backoff))
+            backoff = _next_backoff(backoff)
             continue
 
         # 5xx – treat as transient
@@ -150,7 +240,7 @@ async def _tmdb_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
                     status=resp.status_code,
                 )
             await asyncio.sleep(backoff)
-            backoff *= 2
+            backoff = _next_backoff(backoff)
             continue
 
         # Other 4xx – permanent
@@ -161,10 +251,10 @@ async def _tmdb_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
                 status=resp.status_code,
             )
 
-        # Success – parse JSON
+        # Success – parse JSON straight from the response bytes
         try:
-            return resp.json()
-        except ValueError as e:
+            return orjson.loads(resp.content)
+        except orjson.JSONDecodeError as e:
             raise TMDBError(
                 f"Failed to parse TMDB JSON: {e}",
                 code="JSON_ERROR",
@@ -177,53 +267,156 @@ async def _tmdb_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
 
 def _map_search_item(item: Dict[str, Any], item_type: str) -> Dict[str, Any]:
     """Normalise TMDB search/discover results to the spec."""
-    title = item.get("title") or item.get("name") or ""
-    year = None
-    date_field = item.get("release_date") or item.get("first_air_date")
-    if date_field:
-        year = int(date_field.split("-")[0])
-    rating = float(item.get("vote_average") or 0.0)
+    # Called once per TMDB result, so keep lookups local and cheap.
+    g = item.get
+    date_field = g("release_date") or g("first_air_date")
 
     return {
         "id": int(item["id"]),
-        "title": title,
+        "title": g("title") or g("name") or "",
         "type": item_type,
-        "year": year,
-        "rating": rating,
-        "overview": item.get("overview", ""),
-        "poster_path": item.get("poster_path"),
+        "year": int(date_field[:4]) if date_field else None,
+        "rating": float(g("vote_average") or 0.0),
+        "overview": g("overview", ""),
+        "poster_path": g("poster_path"),
     }
 
 
-async def _search_title(args: Dict[str, Any]) -> Any:
-    query = args.get("query", "").strip()
+async def _tmdb_get_pages(path: str, params: Dict[str, Any], pages: int) -> List[Dict[str, Any]]:
+    """Fetch result pages 1..pages concurrently and return the de-duplicated items."""
+    if pages == 1:
+        data_pages = [await _tmdb_get(path, params)]
+    else:
+        # TaskGroup cancels the remaining pages as soon as one fails; re-raise
+        # that first error unwrapped so callers still see a plain TMDBError.
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(_tmdb_get(path, {**params, "page": p})) for p in range(1, pages + 1)]
+        except* Exception as eg:
+            raise eg.exceptions[0]
+        data_pages = [task.result() for task in tasks]
+
+    seen = set()
+    results: List[Dict[str, Any]] = []
+    for item in itertools.chain.from_iterable(d.get("results", []) for d in data_pages):
+        if item["id"] in seen:
+            continue
+        seen.add(item["id"])
+        results.append(item)
+    return results
+
+
+# -----------------------------------------------------------------------------
+# Tool argument schemas
+# -----------------------------------------------------------------------------
+
+ItemType = Literal["movie", "tv"]
+Pages = Annotated[int, msgspec.Meta(ge=1, le=MAX_PAGES)]
+
+
+class SearchArgs(msgspec.Struct):
+    query: str
+    # "" is accepted and, like null, falls back to "movie".
+    type: Optional[Literal["movie", "tv", ""]] = None
+    year: Optional[int] = None
+    language: Optional[str] = None
+    pages: Optional[Pages] = None
+
+
+class RecommendationsArgs(msgspec.Struct):
+    id: int
+    type: ItemType
+
+
+class DiscoverArgs(msgspec.Struct):
+    type: ItemType
+    genre: Optional[List[str]] = None
+    year: Optional[int] = None
+    language: Optional[str] = None
+    sort_by: Optional[Literal["popularity", "vote_average"]] = None
+    pages: Optional[Pages] = None
+
+
+_ArgsT = TypeVar("_ArgsT", bound=msgspec.Struct)
+
+
+def _convert_args(args: Dict[str, Any], args_type: Type[_ArgsT]) -> _ArgsT:
+    """Validate raw tool arguments in one msgspec pass (lax, so "123" -> 123)."""
+    try:
+        return msgspec.convert(args, args_type, strict=False)
+    except msgspec.ValidationError as e:
+        raise TMDBError(str(e), code="VALIDATION_ERROR", status=400)
+
+
+# {item_type: {genre_name_lower: genre_id}}, refreshed daily.
+_GENRE_CACHE: TTLCache = TTLCache(maxsize=2, ttl=GENRE_CACHE_TTL_SECONDS)
+
+
+# In-flight genre-list fetches per item type, so concurrent first uses share one request.
+_genre_inflight: Dict[str, "asyncio.Future[Dict[str, int]]"] = {}
+
+
+async def _load_genres(item_type: str) -> Dict[str, int]:
+    """Fetch (once per TTL) the genre name -> id mapping for movies or TV."""
+    while True:
+        try:
+            return _GENRE_CACHE[item_type]
+        except KeyError:
+            pass
+        inflight = _genre_inflight.get(item_type)
+        if inflight is None:
+            break
+        try:
+            return await asyncio.shield(inflight)
+        except _OwnerCancelled:
+            continue
+
+    fut = asyncio.get_running_loop().create_future()
+    _genre_inflight[item_type] = fut
+    try:
+        data = await _tmdb_get(f"/genre/{item_type}/list", {"language": "en-US"})
+        genres = {g["name"].lower(): int(g["id"]) for g in data.get("genres", [])}
+        _GENRE_CACHE[item_type] = genres
+        fut.set_result(genres)
+        return genres
+    except asyncio.CancelledError:
+        fut.set_exception(_OwnerCancelled())
+        fut.exception()
+        raise
+    except Exception as e:
+        fut.set_exception(e)
+        fut.exception()
+        raise
+    finally:
+        if _genre_inflight.get(item_type) is fut:
+            del _genre_inflight[item_type]
+
+
+async def _search_title(raw_args: Dict[str, Any]) -> Any:
+    args = _convert_args(raw_args, SearchArgs)
+    query = args.query.strip()
     if not query:
         raise TMDBError("query is required", code="VALIDATION_ERROR", status=400)
 
-    item_type = args.get("type") or "movie"
-    if item_type not in ("movie", "tv"):
-        raise TMDBError("type must be 'movie' or 'tv'", code="VALIDATION_ERROR", status=400)
-
-    year = args.get("year")
-    language = args.get("language") or "en-US"
+    item_type = _ITEM_TYPES[args.type or "movie"]
+    year = args.year
 
-    params: Dict[str, Any] = {"query": query, "language": language, "include_adult": False}
+    params: Dict[str, Any] = {"query": query, "language": args.language or "en-US", "include_adult": False}
     if year is not None:
-        if not isinstance(year, int):
-            raise TMDBError("year must be an integer", code="VALIDATION_ERROR", status=400)
         if item_type == "movie":
             params["primary_release_year"] = year
         else:
             params["first_air_date_year"] = year
 
     path = "/search/movie" if item_type == "movie" else "/search/tv"
-    data = await _tmdb_get(path, params)
-
-    results = data.get("results", [])
+    results = await _tmdb_get_pages(path, params, args.pages or 1)
     if not results:
-        raise TMDBError(f"No results for query '{query}'", code="TITLE_NOT_FOUND", status=404)
+        message = f"No results for query '{query}'"
+        _negative_cache[_cache_key("search_title", raw_args)] = message
+        raise TMDBError(message, code="TITLE_NOT_FOUND", status=404)
 
-    mapped = [_map_search_item(item, item_type) for item in results]
+    map_fn = _map_search_item
+    mapped = [map_fn(item, item_type) for item in results]
     return {
         "results": mapped,
         "source": "TMDB",
@@ -231,15 +424,10 @@ async def _search_title(args: Dict[str, Any]) -> Any:
     }
 
 
-async def _get_recommendations(args: Dict[str, Any]) -> Any:
-    try:
-        media_id = int(args.get("id"))
-    except (TypeError, ValueError):
-        raise TMDBError("id must be an integer", code="VALIDATION_ERROR", status=400)
-
-    item_type = args.get("type")
-    if item_type not in ("movie", "tv"):
-        raise TMDBError("type must be 'movie' or 'tv'", code="VALIDATION_ERROR", status=400)
+async def _get_recommendations(raw_args: Dict[str, Any]) -> Any:
+    args = _convert_args(raw_args, RecommendationsArgs)
+    media_id = args.id
+    item_type = args.type
 
     path = f"/movie/{media_id}/recommendations" if item_type == "movie" else f"/tv/{media_id}/recommendations"
     params = {"language": "en-US"}
@@ -271,44 +459,183 @@ async def _get_recommendations(args: Dict[str, Any]) -> Any:
     }
 
 
-async def _discover(args: Dict[str, Any]) -> Any:
-    item_type = args.get("type")
-    if item_type not in ("movie", "tv"):
-        raise TMDBError("type must be 'movie' or 'tv'", code="VALIDATION_ERROR", status=400)
-
-    genre_names = args.get("genre") or []
-    year = args.get("year")
-    language = args.get("language") or "en-US"
-    sort_by = args.get("sort_by") or "popularity"
+async def _discover(raw_args: Dict[str, Any]) -> Any:
+    args = _convert_args(raw_args, DiscoverArgs)
+    item_type = _ITEM_TYPES[args.type]
 
-    if sort_by not in ("popularity", "vote_average"):
-        raise TMDBError("sort_by must be 'popularity' or 'vote_average'", code="VALIDATION_ERROR", status=400)
+    genre_names = args.genre or []
+    year = args.year
+    sort_by = args.sort_by or "popularity"
 
-    # For simplicity, we let TMDB handle genres via comma-separated ids.
-    # Here we just pass names as a filter phrase using 'with_keywords' style.
-    # In a full implementation, you'd map genre names to ids via /genre/movie/list.
     params: Dict[str, Any] = {
-        "language": language,
+        "language": args.language or "en-US",
         "include_adult": False,
         "sort_by": f"{sort_by}.desc",
     }
 
+    ignored_genres: List[str] = []
+    degraded = False
+    if genre_names:
+        # TMDB filters on genre ids; comma-separated ids must all match.
+        try:
+            genres = await _load_genres(item_type)
+        except TMDBError as e:
+            # Still return results, but say they're unfiltered (and don't cache them).
+            logger.warning("Could not load %s genre list, genre filter not applied: %s", item_type, e)
+            ignored_genres = list(genre_names)
+            degraded = True
+        else:
+            ids = [genres[g.lower()] for g in genre_names if g.lower() in genres]
+            ignored_genres = [g for g in genre_names if g.lower() not in genres]
+            if ignored_genres:
+                logger.warning("Ignoring unknown %s genres: %s", item_type, ignored_genres)
+            if ids:
+                params["with_genres"] = ",".join(map(str, ids))
+
     if year is not None:
-        if not isinstance(year, int):
-            raise TMDBError("year must be an integer", code="VALIDATION_ERROR", status=400)
         if item_type == "movie":
             params["primary_release_year"] = year
         else:
             params["first_air_date_year"] = year
 
     path = "/discover/movie" if item_type == "movie" else "/discover/tv"
-    data = await _tmdb_get(path, params)
+    results = await _tmdb_get_pages(path, params, args.pages or 1)
+    map_fn = _map_search_item
+    mapped = [map_fn(item, item_type) for item in results]
 
-    results = data.get("results", [])
-    mapped = [_map_search_item(item, item_type) for item in results]
+    payload: Dict[str, Any] = {
+        "results": mapped,
+        "source": "TMDB",
+        "fetched_at": time.time(),
+    }
+    if ignored_genres:
+        payload["ignored_genres"] = ignored_genres
+    if degraded:
+        payload["degraded"] = True
+        payload["message"] = "TMDB genre list unavailable; results are NOT filtered by genre."
+    return payload
+
+
+# Cacheable TMDB-backed tools; health and batch_execute are handled separately.
+_DISPATCH: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+    "search_title": _search_title,
+    "get_recommendations": _get_recommendations,
+    "discover": _discover,
+}
+
+
+async def _call_single_flight(name: str, arguments: Dict[str, Any], key: Tuple[str, Any]) -> Tuple[Any, str]:
+    """Run a cache-missed tool call, sharing one execution between identical concurrent calls.
+
+    Returns the same (payload, encoded_text) pair that is stored in the cache.
+    """
+    while True:
+        inflight = _inflight.get(key)
+        if inflight is None:
+            break
+        # Identical call already running – wait for its result.
+        logger.info("Joining in-flight call for %s", name)
+        try:
+            return await asyncio.shield(inflight)
+        except _OwnerCancelled:
+            # The owning call was cancelled, not this one – look again / take over.
+            continue
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        handler = _DISPATCH.get(name)
+        if handler is None:
+            raise TMDBError(f"Unknown tool: {name}", code="UNKNOWN_TOOL", status=400)
+        payload = await handler(arguments)
+
+        # Degraded (partial) payloads are returned but never cached.
+        if payload.get("degraded"):
+            entry = (payload, orjson.dumps(payload).decode())
+        else:
+            entry = (payload, _cache_set(key, payload))
+        fut.set_result(entry)
+        return entry
+    except asyncio.CancelledError:
+        fut.set_exception(_OwnerCancelled())
+        fut.exception()
+        raise
+    except Exception as e:
+        fut.set_exception(e)
+        # Mark as retrieved so an unjoined failure isn't logged twice.
+        fut.exception()
+        raise
+    finally:
+        if _inflight.get(key) is fut:
+            del _inflight[key]
+
+
+async def _run_sub_call(tool: str, args: Dict[str, Any]) -> Any:
+    """Run one batch_execute sub-call through the cache and single-flight map, without the MCP envelope."""
+    if tool not in _DISPATCH:
+        raise TMDBError(f"Tool not allowed in batch: {tool}", code="VALIDATION_ERROR", status=400)
+    key = _cache_key(tool, args)
+    if tool == "search_title":
+        _raise_if_not_found(key)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached[0]
+
+    payload, _ = await _call_single_flight(tool, args, key)
+    return payload
+
+
+async def _batch_execute(args: Dict[str, Any]) -> Any:
+    calls = args.get("calls")
+    if not isinstance(calls, list) or not calls:
+        raise TMDBError("calls must be a non-empty list", code="VALIDATION_ERROR", status=400)
+    if len(calls) > MAX_BATCH_CALLS:
+        raise TMDBError(
+            f"at most {MAX_BATCH_CALLS} calls are allowed per batch",
+            code="VALIDATION_ERROR",
+            status=400,
+        )
+    for call in calls:
+        if not isinstance(call, dict) or not isinstance(call.get("tool"), str):
+            raise TMDBError("each call needs a 'tool' name", code="VALIDATION_ERROR", status=400)
+        if not isinstance(call.get("args", {}), dict):
+            raise TMDBError("call args must be an object", code="VALIDATION_ERROR", status=400)
+
+    max_concurrent = args.get("maxConcurrent", DEFAULT_BATCH_CONCURRENCY)
+    if not isinstance(max_concurrent, int) or isinstance(max_concurrent, bool) or max_concurrent < 1:
+        raise TMDBError("maxConcurrent must be a positive integer", code="VALIDATION_ERROR", status=400)
+    stop_on_error = args.get("stopOnError", False)
+    if not isinstance(stop_on_error, bool):
+        raise TMDBError("stopOnError must be a boolean", code="VALIDATION_ERROR", status=400)
+
+    semaphore = asyncio.Semaphore(max_concurrent)
+    failed = False
+
+    async def run(call: Dict[str, Any]) -> Any:
+        nonlocal failed
+        async with semaphore:
+            if stop_on_error and failed:
+                raise TMDBError("Skipped after an earlier error", code="SKIPPED", status=400)
+            try:
+                return await _run_sub_call(call["tool"], call.get("args", {}))
+            except Exception:
+                failed = True
+                raise
+
+    outcomes = await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+
+    results: List[Dict[str, Any]] = []
+    for call, outcome in zip(calls, outcomes):
+        if isinstance(outcome, TMDBError):
+            results.append({"tool": call["tool"], "ok": False, "error": outcome.code, "message": str(outcome)})
+        elif isinstance(outcome, BaseException):
+            logger.error("Unexpected error in batch sub-call %s", call["tool"], exc_info=outcome)
+            results.append({"tool": call["tool"], "ok": False, "error": "INTERNAL_ERROR", "message": str(outcome)})
+        else:
+            results.append({"tool": call["tool"], "ok": True, "result": outcome})
 
     return {
-        "results": mapped,
+        "results": results,
         "source": "TMDB",
         "fetched_at": time.time(),
     }
@@ -318,61 +645,97 @@ async def _discover(args: Dict[str, Any]) -> Any:
 # MCP tool wiring
 # -----------------------------------------------------------------------------
 
-@server.list_tools()
-async def list_tools() -> List[Tool]:
-    """Advertise the three tools + their JSON schemas to the agent."""
-    return [
-        Tool(
-            name="search_title",
-            description="Search for a movie or TV show by title.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string"},
-                    "type": {"type": "string", "enum": ["movie", "tv"]},
-                    "year": {"type": "integer"},
-                    "language": {"type": "string"},
-                },
-                "required": ["query"],
+# Tool schemas are static, so build them once and hand out the same list.
+_TOOLS: List[Tool] = [
+    Tool(
+        name="search_title",
+        description="Search for a movie or TV show by title.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "type": {"type": "string", "enum": ["movie", "tv"]},
+                "year": {"type": "integer"},
+                "language": {"type": "string"},
+                "pages": {"type": "integer", "minimum": 1, "maximum": MAX_PAGES},
             },
-        ),
-        Tool(
-            name="get_recommendations",
-            description="Get TMDB recommendations given a title id and type.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "id": {"type": "integer"},
-                    "type": {"type": "string", "enum": ["movie", "tv"]},
-                },
-                "required": ["id", "type"],
+            "required": ["query"],
+        },
+    ),
+    Tool(
+        name="get_recommendations",
+        description="Get TMDB recommendations given a title id and type.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "id": {"type": "integer"},
+                "type": {"type": "string", "enum": ["movie", "tv"]},
             },
-        ),
-        Tool(
-            name="discover",
-            description="Discover movies or TV shows by filters like genre/year/language.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "type": {"type": "string", "enum": ["movie", "tv"]},
-                    "genre": {"type": "array", "items": {"type": "string"}},
-                    "year": {"type": "integer"},
-                    "language": {"type": "string"},
-                    "sort_by": {"type": "string", "enum": ["popularity", "vote_average"]},
-                },
-                "required": ["type"],
+            "required": ["id", "type"],
+        },
+    ),
+    Tool(
+        name="discover",
+        description="Discover movies or TV shows by filters like genre/year/language.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "enum": ["movie", "tv"]},
+                "genre": {"type": "array", "items": {"type": "string"}},
+                "year": {"type": "integer"},
+                "language": {"type": "string"},
+                "sort_by": {"type": "string", "enum": ["popularity", "vote_average"]},
+                "pages": {"type": "integer", "minimum": 1, "maximum": MAX_PAGES},
             },
+            "required": ["type"],
+        },
+    ),
+    Tool(
+        name="batch_execute",
+        description=(
+            "Run several search_title/get_recommendations/discover calls concurrently "
+            "and return all results in one response."
         ),
-        Tool(
-            name="health",
-            description="Checks if the MCP server is running and TMDB key is configured.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "additionalProperties": False,
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "calls": {
+                    "type": "array",
+                    "maxItems": MAX_BATCH_CALLS,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "tool": {
+                                "type": "string",
+                                "enum": ["search_title", "get_recommendations", "discover"],
+                            },
+                            "args": {"type": "object"},
+                        },
+                        "required": ["tool", "args"],
+                    },
+                },
+                "maxConcurrent": {"type": "integer", "minimum": 1},
+                "stopOnError": {"type": "boolean"},
             },
-        ),
-    ]
+            "required": ["calls"],
+        },
+    ),
+    Tool(
+        name="health",
+        description="Checks if the MCP server is running and TMDB key is configured.",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "additionalProperties": False,
+        },
+    ),
+]
+
+
+@server.list_tools()
+async def list_tools() -> List[Tool]:
+    """Advertise the tools + their JSON schemas to the agent."""
+    return _TOOLS
 
 
 @server.call_tool()
@@ -384,12 +747,13 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
     if name == "health":
         payload = {
             "status": "ok",
-            "tmdb_api_key_configured": bool(TMDB_API_KEY),
+            "tmdb_api_key_configured": _HAVE_KEY,
             "cache_entries": len(_cache),
-            "timestamp_utc": datetime.now(timezone.utc).isoformat()
+            "now_ts": time.time(),
+            "started_at": _STARTUP_ISO,
         }
         return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps(payload))],
+            content=[TextContent(type="text", text=orjson.dumps(payload).decode())],
             isError=False,
         )
 
@@ -397,40 +761,40 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
     start = time.time()
 
     try:
-        cached = _cache_get(name, arguments)
+        # Sub-calls are cached individually, so the batch itself is not.
+        if name == "batch_execute":
+            payload = await _batch_execute(arguments)
+            logger.info("Tool %s completed in %.2fs", name, time.time() - start)
+            return CallToolResult(
+                content=[TextContent(type="text", text=orjson.dumps(payload).decode())]
+            )
+
+        key = _cache_key(name, arguments)
+        if name == "search_title":
+            _raise_if_not_found(key)
+        cached = _cache_get(key)
         if cached is not None:
             logger.info("Cache hit for %s", name)
-            payload = cached
+            text = cached[1]
         else:
-            if name == "search_title":
-                payload = await _search_title(arguments)
-            elif name == "get_recommendations":
-                payload = await _get_recommendations(arguments)
-            elif name == "discover":
-                payload = await _discover(arguments)
-            else:
-                raise TMDBError(f"Unknown tool: {name}", code="UNKNOWN_TOOL", status=400)
-
-            _cache_set(name, arguments, payload)
+            _, text = await _call_single_flight(name, arguments, key)
 
         logger.info("Tool %s completed in %.2fs", name, time.time() - start)
 
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps(payload))]
-        )
+        return CallToolResult(content=[TextContent(type="text", text=text)])
     except TMDBError as e:
         logger.error("TMDBError in %s: %s", name, e)
         return CallToolResult(
             content=[
                 TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=orjson.dumps(
                         {
                             "error": e.code,
                             "message": str(e),
                             "source": "TMDB",
                         }
-                    ),
+                    ).decode(),
                 )
             ],
             isError=True,
@@ -442,12 +806,12 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
             content=[
                 TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=orjson.dumps(
                         {
                             "error": "INTERNAL_ERROR",
                             "message": str(e),
                         }
-                    ),
+                    ).decode(),
                 )
             ],
             isError=True,
@@ -461,19 +825,23 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
 
 async def main() -> None:
     # Run the MCP server over stdio for ADK
-    async with stdio_server() as (read, write):
-        await server.run(
-            read,
-            write,
-            InitializationOptions(
-                server_name="tmdb-film-tv-explorer",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read, write):
+            await server.run(
+                read,
+                write,
+                InitializationOptions(
+                    server_name="tmdb-film-tv-explorer",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        if _http_client is not None:
+            await _http_client.aclose()
 
 
 if __name__ == "__main__":
@@ -38,3 +38,461 @@ async def test_search_title_success(monkeypatch):
     assert "results" in res
     assert res["results"][0]["title"] == "Inception"
     assert res["results"][0]["year"] == 2010
+
+
+def test_cache_key_is_order_independent_and_handles_lists():
+    mcp_server._cache.clear()
+    mcp_server._cache_set(mcp_server._cache_key("discover", {"type": "movie", "genre": ["Thriller"]}), {"results": []})
+
+    cached = mcp_server._cache_get(mcp_server._cache_key("discover", {"genre": ["Thriller"], "type": "movie"}))
+    assert cached == ({"results": []}, '{"results":[]}')
+    assert mcp_server._cache_get(mcp_server._cache_key("discover", {"type": "tv", "genre": ["Thriller"]})) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_request(monkeypatch):
+    mcp_server._cache.clear()
+    calls = []
+
+    async def fake_search_title(args):
+        calls.append(args)
+        await asyncio.sleep(0.01)
+        return {"results": [], "source": "TMDB", "fetched_at": 0}
+
+    monkeypatch.setitem(mcp_server._DISPATCH, "search_title", fake_search_title)
+
+    args = {"query": "Inception", "type": "movie"}
+    first, second = await asyncio.gather(
+        mcp_server.call_tool("search_title", args),
+        mcp_server.call_tool("search_title", dict(args)),
+    )
+
+    assert len(calls) == 1
+    assert json.loads(first.content[0].text) == json.loads(second.content[0].text)
+    assert not mcp_server._inflight
+
+
+@pytest.mark.asyncio
+async def test_discover_fetches_pages_concurrently_and_dedupes(monkeypatch):
+    requested_pages = []
+
+    async def fake_tmdb_get(path, params):
+        page = params["page"]
+        requested_pages.append(page)
+        return {
+            "results": [
+                {"id": page, "title": f"Movie {page}", "release_date": "2020-01-01"},
+                {"id": 99, "title": "Shared", "release_date": "2021-01-01"},
+            ]
+        }
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    res = await mcp_server._discover({"type": "movie", "pages": 3})
+    assert sorted(requested_pages) == [1, 2, 3]
+    assert [r["id"] for r in res["results"]] == [1, 99, 2, 3]
+
+    with pytest.raises(mcp_server.TMDBError):
+        await mcp_server._discover({"type": "movie", "pages": mcp_server.MAX_PAGES + 1})
+
+
+@pytest.mark.asyncio
+async def test_batch_execute_reports_per_call_results(monkeypatch):
+    mcp_server._cache.clear()
+
+    async def fake_tmdb_get(path, params):
+        return {"results": [{"id": 1, "title": "Arrival", "release_date": "2016-11-11"}]}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    res = await mcp_server._batch_execute(
+        {
+            "calls": [
+                {"tool": "search_title", "args": {"query": "Arrival"}},
+                {"tool": "discover", "args": {"type": "documentary"}},
+            ],
+            "maxConcurrent": 2,
+        }
+    )
+
+    first, second = res["results"]
+    assert first["ok"] is True
+    assert first["result"]["results"][0]["title"] == "Arrival"
+    assert second["ok"] is False
+    assert second["error"] == "VALIDATION_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_tmdb_get_retries_rate_limit_using_retry_after(monkeypatch):
+    responses = iter(
+        [
+            mcp_server.httpx.Response(429, headers={"Retry-After": "0.5"}),
+            mcp_server.httpx.Response(200, json={"results": []}),
+        ]
+    )
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    async with mcp_server.httpx.AsyncClient(
+        base_url=mcp_server.TMDB_BASE_URL,
+        transport=mcp_server.httpx.MockTransport(lambda request: next(responses)),
+    ) as client:
+        monkeypatch.setattr(mcp_server, "TMDB_API_KEY", "test-key")
+        monkeypatch.setattr(mcp_server, "_http_client", client)
+        monkeypatch.setattr(mcp_server.asyncio, "sleep", fake_sleep)
+
+        assert await mcp_server._tmdb_get("/search/movie", {"query": "x"}) == {"results": []}
+    assert delays == [0.5]
+
+
+@pytest.mark.asyncio
+async def test_tmdb_get_retries_mid_request_disconnect(monkeypatch):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise mcp_server.httpx.RemoteProtocolError("Server disconnected", request=request)
+        return mcp_server.httpx.Response(200, json={"results": []})
+
+    async def fake_sleep(delay):
+        pass
+
+    async with mcp_server.httpx.AsyncClient(
+        base_url=mcp_server.TMDB_BASE_URL,
+        transport=mcp_server.httpx.MockTransport(handler),
+    ) as client:
+        monkeypatch.setattr(mcp_server, "TMDB_API_KEY", "test-key")
+        monkeypatch.setattr(mcp_server, "_http_client", client)
+        monkeypatch.setattr(mcp_server.asyncio, "sleep", fake_sleep)
+
+        assert await mcp_server._tmdb_get("/search/movie", {"query": "x"}) == {"results": []}
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_tmdb_get_retries_connect_errors(monkeypatch):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        raise mcp_server.httpx.ConnectError("connection refused", request=request)
+
+    async def fake_sleep(delay):
+        pass
+
+    async with mcp_server.httpx.AsyncClient(
+        base_url=mcp_server.TMDB_BASE_URL,
+        transport=mcp_server.httpx.MockTransport(handler),
+    ) as client:
+        monkeypatch.setattr(mcp_server, "TMDB_API_KEY", "test-key")
+        monkeypatch.setattr(mcp_server, "_http_client", client)
+        monkeypatch.setattr(mcp_server.asyncio, "sleep", fake_sleep)
+
+        with pytest.raises(mcp_server.TMDBError) as excinfo:
+            await mcp_server._tmdb_get("/search/movie", {"query": "x"})
+    assert excinfo.value.code == "NETWORK_ERROR"
+    assert len(attempts) == mcp_server.MAX_RETRIES
+
+
+@pytest.mark.asyncio
+async def test_shared_client_honours_https_proxy_env(monkeypatch):
+    import httpcore
+
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+    monkeypatch.setattr(mcp_server, "_http_client", None)
+    client = await mcp_server._get_client()
+    try:
+        transport = client._transport_for_url(mcp_server.httpx.URL(mcp_server.TMDB_BASE_URL))
+        assert isinstance(transport._pool, httpcore.AsyncHTTPProxy)
+        assert transport._pool._proxy_url.host == b"proxy.example"
+    finally:
+        await client.aclose()
+
+
+
+
+@pytest.mark.asyncio
+async def test_not_found_search_is_negatively_cached(monkeypatch):
+    mcp_server._cache.clear()
+    mcp_server._negative_cache.clear()
+    calls = []
+
+    async def fake_tmdb_get(path, params):
+        calls.append(params)
+        return {"results": []}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    for _ in range(2):
+        res = await mcp_server.call_tool("search_title", {"query": "xyzzy"})
+        assert res.isError
+        assert json.loads(res.content[0].text)["error"] == "TITLE_NOT_FOUND"
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_discover_maps_genre_names_to_ids(monkeypatch):
+    mcp_server._GENRE_CACHE.clear()
+    requests = []
+
+    async def fake_tmdb_get(path, params):
+        requests.append((path, params))
+        if path == "/genre/movie/list":
+            return {"genres": [{"id": 53, "name": "Thriller"}, {"id": 18, "name": "Drama"}]}
+        return {"results": []}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    await mcp_server._discover({"type": "movie", "genre": ["thriller", "Drama", "Unknown"]})
+    await mcp_server._discover({"type": "movie", "genre": ["Drama"]})
+
+    paths = [path for path, _ in requests]
+    assert paths.count("/genre/movie/list") == 1
+    discover_params = [params for path, params in requests if path == "/discover/movie"]
+    assert discover_params[0]["with_genres"] == "53,18"
+    assert discover_params[1]["with_genres"] == "18"
+
+
+@pytest.mark.asyncio
+async def test_cache_key_handles_nested_dict_arguments(monkeypatch):
+    mcp_server._cache.clear()
+    mcp_server._negative_cache.clear()
+
+    async def fake_tmdb_get(path, params):
+        return {"results": [{"id": 1, "title": "X", "release_date": "2000-01-01"}]}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    key = mcp_server._cache_key("search_title", {"query": "x", "extra": {"b": [1], "a": 1}})
+    assert key == mcp_server._cache_key("search_title", {"extra": {"a": 1, "b": [1]}, "query": "x"})
+
+    res = await mcp_server.call_tool("search_title", {"query": "x", "extra": {"a": 1}})
+    assert not res.isError
+
+
+@pytest.mark.asyncio
+async def test_joined_call_survives_owner_cancellation(monkeypatch):
+    mcp_server._cache.clear()
+    calls = []
+
+    async def fake_search_title(args):
+        calls.append(args)
+        if len(calls) == 1:
+            await asyncio.Event().wait()  # owner hangs until cancelled
+        return {"results": [], "source": "TMDB", "fetched_at": 0}
+
+    monkeypatch.setitem(mcp_server._DISPATCH, "search_title", fake_search_title)
+
+    args = {"query": "Inception"}
+    owner = asyncio.create_task(mcp_server.call_tool("search_title", args))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(mcp_server.call_tool("search_title", dict(args)))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    res = await joiner
+
+    assert owner.cancelled()
+    assert not res.isError
+    assert len(calls) == 2
+    assert not mcp_server._inflight
+
+
+@pytest.mark.asyncio
+async def test_batch_execute_coalesces_identical_sub_calls(monkeypatch):
+    mcp_server._cache.clear()
+    calls = []
+
+    async def fake_tmdb_get(path, params):
+        calls.append(path)
+        await asyncio.sleep(0.01)
+        return {"results": [{"id": 1, "title": "Arrival", "release_date": "2016-11-11"}]}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    call = {"tool": "search_title", "args": {"query": "Arrival"}}
+    res = await mcp_server._batch_execute({"calls": [call, dict(call)], "maxConcurrent": 2})
+
+    assert [r["ok"] for r in res["results"]] == [True, True]
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [("2", 2.0), ("3600", mcp_server.MAX_BACKOFF_SECONDS), ("-5", 0.0), ("nan", 0.25), ("soon", 0.25)],
+)
+def test_retry_after_is_clamped(header, expected):
+    resp = mcp_server.httpx.Response(429, headers={"Retry-After": header})
+    assert mcp_server._retry_after(resp, 0.25) == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("args", [{}, {"query": "   "}, {"query": "x", "type": "anime"}])
+async def test_search_title_rejects_invalid_args(args):
+    with pytest.raises(mcp_server.TMDBError) as excinfo:
+        await mcp_server._search_title(args)
+    assert excinfo.value.code == "VALIDATION_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_search_title_defaults_null_and_blank_optionals(monkeypatch):
+    seen = []
+
+    async def fake_tmdb_get(path, params):
+        seen.append((path, params))
+        return {"results": [{"id": 1, "title": "X", "release_date": "2000-01-01"}]}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    await mcp_server._search_title({"query": "x", "type": "", "language": None, "pages": None})
+    path, params = seen[0]
+    assert path == "/search/movie"
+    assert params["language"] == "en-US"
+    assert "page" not in params
+
+
+@pytest.mark.asyncio
+async def test_get_recommendations_accepts_string_id_and_rejects_bad_type(monkeypatch):
+    seen = []
+
+    async def fake_tmdb_get(path, params):
+        seen.append(path)
+        return {"results": []}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    await mcp_server._get_recommendations({"id": "123", "type": "tv"})
+    assert seen == ["/tv/123/recommendations"]
+
+    with pytest.raises(mcp_server.TMDBError) as excinfo:
+        await mcp_server._get_recommendations({"id": 123, "type": "book"})
+    assert excinfo.value.code == "VALIDATION_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_discover_flags_and_skips_caching_when_genre_list_unavailable(monkeypatch):
+    mcp_server._GENRE_CACHE.clear()
+    requests = []
+
+    async def fake_tmdb_get(path, params):
+        requests.append(path)
+        if path == "/genre/tv/list":
+            raise mcp_server.TMDBError("TMDB service unavailable", code="UPSTREAM_ERROR", status=503)
+        await asyncio.sleep(0)
+        return {"results": [{"id": 7, "name": "Show", "first_air_date": "2020-05-01"}]}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    mcp_server._cache.clear()
+    for _ in range(2):
+        res = await mcp_server.call_tool("discover", {"type": "tv", "genre": ["Drama"]})
+        payload = json.loads(res.content[0].text)
+        assert payload["results"][0]["title"] == "Show"
+        assert payload["degraded"] is True
+        assert payload["ignored_genres"] == ["Drama"]
+
+    # Degraded results are not cached, so the second call retries the genre list.
+    assert requests == ["/genre/tv/list", "/discover/tv"] * 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_discovers_fetch_genre_list_once(monkeypatch):
+    mcp_server._GENRE_CACHE.clear()
+    requests = []
+
+    async def fake_tmdb_get(path, params):
+        requests.append(path)
+        await asyncio.sleep(0.01)
+        if path == "/genre/movie/list":
+            return {"genres": [{"id": 18, "name": "Drama"}]}
+        return {"results": []}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    await asyncio.gather(
+        mcp_server._discover({"type": "movie", "genre": ["Drama"]}),
+        mcp_server._discover({"type": "movie", "genre": ["Drama"], "year": 2020}),
+    )
+    assert requests.count("/genre/movie/list") == 1
+
+
+def test_cache_key_distinguishes_dicts_from_lists_of_pairs():
+    as_dict = mcp_server._cache_key("discover", {"type": "movie", "extra": {"a": 1}})
+    as_pairs = mcp_server._cache_key("discover", {"type": "movie", "extra": [["a", 1]]})
+    assert as_dict != as_pairs
+
+
+@pytest.mark.asyncio
+async def test_failed_page_cancels_remaining_page_fetches(monkeypatch):
+    cancelled = []
+
+    async def fake_tmdb_get(path, params):
+        if params["page"] == 1:
+            raise mcp_server.TMDBError("TMDB service unavailable", code="UPSTREAM_ERROR", status=503)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(params["page"])
+            raise
+        return {"results": []}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    with pytest.raises(mcp_server.TMDBError) as excinfo:
+        await mcp_server._discover({"type": "movie", "pages": 3})
+    assert excinfo.value.code == "UPSTREAM_ERROR"
+    assert sorted(cancelled) == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_batch_execute_rejects_non_boolean_stop_on_error():
+    with pytest.raises(mcp_server.TMDBError) as excinfo:
+        await mcp_server._batch_execute(
+            {"calls": [{"tool": "search_title", "args": {"query": "x"}}], "stopOnError": "false"}
+        )
+    assert excinfo.value.code == "VALIDATION_ERROR"
+
+
+@pytest.mark.asyncio
+async def test_call_tool_builds_cache_key_once(monkeypatch):
+    mcp_server._cache.clear()
+    key_builds = []
+    real_cache_key = mcp_server._cache_key
+
+    def counting_cache_key(tool_name, args):
+        key_builds.append(tool_name)
+        return real_cache_key(tool_name, args)
+
+    async def fake_tmdb_get(path, params):
+        return {"results": []}
+
+    monkeypatch.setattr(mcp_server, "_cache_key", counting_cache_key)
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    await mcp_server.call_tool("discover", {"type": "movie"})  # miss
+    await mcp_server.call_tool("discover", {"type": "movie"})  # hit
+    assert key_builds == ["discover", "discover"]
+
+
+def test_genre_fetch_coalescing_works_across_event_loops(monkeypatch):
+    async def fake_tmdb_get(path, params):
+        await asyncio.sleep(0.01)
+        if path == "/genre/movie/list":
+            return {"genres": [{"id": 18, "name": "Drama"}]}
+        return {"results": []}
+
+    monkeypatch.setattr(mcp_server, "_tmdb_get", fake_tmdb_get)
+
+    async def two_discovers():
+        mcp_server._GENRE_CACHE.clear()
+        await asyncio.gather(
+            mcp_server._discover({"type": "movie", "genre": ["Drama"]}),
+            mcp_server._discover({"type": "movie", "genre": ["Drama"], "year": 2020}),
+        )
+
+    asyncio.run(two_discovers())
+    asyncio.run(two_discovers())